@@ -0,0 +1,202 @@
+# Modo lote: optimiza muchas instancias de reparto sin abrir la ventana del juego.
+#
+# Uso:
+#   python lote.py pedidos/                 # todos los .csv y .json de la carpeta
+#   python lote.py - < instancias.jsonl     # una instancia JSON por línea desde stdin
+#
+# Cada instancia es una lista de coordenadas (x, y); la primera es la pizzería (nodo 0).
+# Por cada instancia se escribe una línea JSON en stdout en cuanto termina.
+# El código de salida es 1 si alguna instancia terminó con error.
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils.algoritmo_hormigas import AlgoritmoHormigas
+
+
+def leer_coordenadas(datos):
+    """
+    Acepta [[x, y], ...], [{"x": .., "y": ..}, ...] o {"coordenadas": [...]}.
+    """
+    if isinstance(datos, dict):
+        datos = datos.get("coordenadas", [])
+    coordenadas = []
+    for punto in datos:
+        if isinstance(punto, dict):
+            coordenadas.append((float(punto["x"]), float(punto["y"])))
+        else:
+            coordenadas.append((float(punto[0]), float(punto[1])))
+    return coordenadas
+
+
+def leer_csv(ruta_archivo):
+    """
+    Lee filas x,y. Solo se permite una cabecera no numérica en la primera fila;
+    cualquier otra fila inválida es un error de la instancia.
+    """
+    coordenadas = []
+    with open(ruta_archivo, newline="") as f:
+        primera = True
+        for numero, fila in enumerate(csv.reader(f), start=1):
+            if not any(campo.strip() for campo in fila):
+                continue
+            try:
+                if len(fila) < 2:
+                    raise ValueError("se esperaban 2 columnas")
+                coordenadas.append((float(fila[0]), float(fila[1])))
+            except ValueError as e:
+                if primera:
+                    # cabecera
+                    primera = False
+                    continue
+                raise ValueError(f"fila {numero} inválida: {fila!r} ({e})")
+            primera = False
+    return coordenadas
+
+
+def leer_json(ruta_archivo):
+    with open(ruta_archivo) as f:
+        return leer_coordenadas(json.load(f))
+
+
+def instancias_de_directorio(directorio):
+    for nombre in sorted(os.listdir(directorio)):
+        ruta_archivo = os.path.join(directorio, nombre)
+        extension = os.path.splitext(nombre)[1].lower()
+        if extension == ".csv":
+            yield nombre, lambda r=ruta_archivo: leer_csv(r)
+        elif extension == ".json":
+            yield nombre, lambda r=ruta_archivo: leer_json(r)
+
+
+def instancias_de_stdin(entrada):
+    for numero, linea in enumerate(entrada, start=1):
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            datos = json.loads(linea)
+        except ValueError as e:
+            def fallar(e=e):
+                raise e
+            yield numero, fallar
+            continue
+        id_instancia = datos.get("id", numero) if isinstance(datos, dict) else numero
+        yield id_instancia, lambda d=datos: leer_coordenadas(d)
+
+
+def matriz_distancias(coordenadas):
+    return [[math.hypot(ax - bx, ay - by) for (bx, by) in coordenadas] for (ax, ay) in coordenadas]
+
+
+def resolver_instancia(id_instancia, coordenadas, n_hormigas, iteraciones, tiempo_limite):
+    """
+    Se ejecuta en un proceso trabajador; devuelve el diccionario que se escribe como línea JSON.
+    """
+    inicio = time.perf_counter()
+    if len(coordenadas) < 2:
+        return {"id": id_instancia, "error": "se necesitan al menos 2 coordenadas"}
+    nodos = list(range(len(coordenadas)))
+    algoritmo = AlgoritmoHormigas(nodos, matriz_distancias(coordenadas),
+                                  n_hormigas=n_hormigas, iteraciones=iteraciones)
+    ruta, distancia = algoritmo.ejecutar(tiempo_limite=tiempo_limite)
+    if ruta is None or not math.isfinite(distancia):
+        return {"id": id_instancia, "error": "el algoritmo no encontró ninguna ruta"}
+    return {
+        "id": id_instancia,
+        "ruta": ruta,
+        "distancia": distancia,
+        "segundos": round(time.perf_counter() - inicio, 6),
+    }
+
+
+def entero_positivo(texto):
+    try:
+        valor = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"se esperaba un entero (recibido {texto!r})")
+    if valor < 1:
+        raise argparse.ArgumentTypeError(f"debe ser >= 1 (recibido {valor})")
+    return valor
+
+
+def segundos_positivos(texto):
+    try:
+        valor = float(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"se esperaba un número (recibido {texto!r})")
+    if not valor > 0:
+        raise argparse.ArgumentTypeError(f"debe ser > 0 (recibido {texto})")
+    return valor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimiza rutas de reparto en lote (sin ventana).")
+    parser.add_argument("origen", help="carpeta con archivos .csv/.json, o '-' para leer JSON lines de stdin")
+    parser.add_argument("--procesos", type=entero_positivo, default=None, help="procesos en paralelo (por defecto: núcleos)")
+    parser.add_argument("--tiempo-limite", type=segundos_positivos, default=None,
+                        help="segundos por instancia (límite blando: se revisa entre hormigas "
+                             "y siempre se completa al menos una)")
+    parser.add_argument("--hormigas", type=entero_positivo, default=10)
+    parser.add_argument("--iteraciones", type=entero_positivo, default=50)
+    args = parser.parse_args(argv)
+
+    if args.origen == "-":
+        instancias = instancias_de_stdin(sys.stdin)
+    elif os.path.isdir(args.origen):
+        instancias = instancias_de_directorio(args.origen)
+    else:
+        parser.error(f"'{args.origen}' no es una carpeta (o usa '-' para stdin)")
+
+    procesos = args.procesos if args.procesos is not None else (os.cpu_count() or 1)
+    # ventana acotada de trabajos en vuelo: no se guarda toda la entrada en memoria.
+    # Cada resultado se escribe desde su callback en cuanto termina, aunque
+    # el hilo principal siga esperando más líneas de la entrada.
+    max_en_vuelo = 2 * procesos
+    candado = threading.Lock()
+    hubo_errores = False
+
+    def escribir(resultado):
+        nonlocal hubo_errores
+        with candado:
+            if "error" in resultado:
+                hubo_errores = True
+            try:
+                linea = json.dumps(resultado, allow_nan=False)
+            except ValueError as e:
+                hubo_errores = True
+                linea = json.dumps({"id": resultado.get("id"), "error": str(e)})
+            print(linea, flush=True)
+
+    def al_terminar(futuro, id_instancia):
+        try:
+            escribir(futuro.result())
+        except Exception as e:
+            escribir({"id": id_instancia, "error": str(e)})
+
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        en_vuelo = set()
+        for id_instancia, cargar in instancias:
+            try:
+                coordenadas = cargar()
+            except Exception as e:
+                escribir({"id": id_instancia, "error": str(e)})
+                continue
+            futuro = ejecutor.submit(resolver_instancia, id_instancia, coordenadas,
+                                     args.hormigas, args.iteraciones, args.tiempo_limite)
+            futuro.add_done_callback(lambda f, i=id_instancia: al_terminar(f, i))
+            en_vuelo.add(futuro)
+            if len(en_vuelo) >= max_en_vuelo:
+                _, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+        # al salir del with se espera a que terminen (y se escriban) los que quedan
+
+    return 1 if hubo_errores else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
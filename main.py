@@ -6,6 +6,8 @@ import math
 import random
 import time
 from utils.algoritmo_hormigas import AlgoritmoHormigas
+from utils.planificador import PlanificadorRutas
+from utils.enrutador import EnrutadorFeromonas
 
 # --- INICIALIZACIÓN ---
 pygame.init()
@@ -30,6 +32,9 @@ def cargar_ruta(ruta_relativa):
 # --- CONFIGURACIÓN ---
 ANCHO, ALTO = 800, 600
 MAPA_ANCHO, MAPA_ALTO = 2000, 2000
+# modo de rectángulos sucios: con la cámara quieta solo se actualizan las zonas que cambian
+# (útil en pantallas con framebuffer por software). Se activa con: python main.py --rects-sucios
+MODO_RECTS_SUCIOS = "--rects-sucios" in sys.argv
 pantalla = pygame.display.set_mode((ANCHO, ALTO))
 pygame.display.set_caption("Repartidor de Pizzas 🍕🐜 - Feromonas controladas (visual)")
 clock = pygame.time.Clock()
@@ -109,6 +114,10 @@ class Repartidor:
         self.y = max(0, min(MAPA_ALTO, self.y))
         self.rect.topleft = (self.x - 10, self.y - 10)
 
+    def area(self, cam_x, cam_y):
+        # zona de pantalla que ocupa el dibujo (sprite, sombra e indicador de pizza)
+        return pygame.Rect(self.x - 18 - cam_x, self.y - 27 - cam_y, 36, 45)
+
     def dibujar(self, pantalla, cam_x, cam_y):
         # Si tenemos imagen de pizzero, la mostramos centrada; si no, fallback al dibujo anterior
         if pizzero_img:
@@ -140,6 +149,11 @@ class Casa:
         self.base_id = base_id if base_id is not None else id_casa
         self.entregada = False
 
+    def area(self, cam_x, cam_y):
+        # mismos números que dibujar(): tejado desde y-25, fachada hasta y+10, ancho x-12..x+12
+        # (+1 px de margen por los bordes del polígono)
+        return pygame.Rect(self.x - 13 - cam_x, self.y - 26 - cam_y, 26, 37)
+
     def dibujar(self, pantalla, cam_x, cam_y, highlight=False):
         pygame.draw.rect(pantalla, (30,30,30), (self.x - 12 - cam_x, self.y - 8 - cam_y, 24, 10))
         base_color = (100, 180, 100) if self.entregada else CASA_COLOR
@@ -164,6 +178,10 @@ class Pizzeria:
         self.x = x
         self.y = y
 
+    def area(self, cam_x, cam_y):
+        # edificio, sombra y rótulo "PIZZA"
+        return pygame.Rect(self.x - 28 - cam_x, self.y - 37 - cam_y, 56, 73)
+
     def dibujar(self, pantalla, cam_x, cam_y, parpadeo=False):
         pygame.draw.rect(pantalla, (20,20,20), (self.x - 26 - cam_x, self.y + 22 - cam_y, 52, 12), border_radius=6)
         color = PIZZERIA_COLOR_ALT if parpadeo else PIZZERIA_COLOR
@@ -289,18 +307,22 @@ def dibujar_flecha(pantalla, x1, y1, x2, y2, color, grosor, offset, cam_x, cam_y
     dx = x2 - x1
     dy = y2 - y1
     distancia = math.hypot(dx, dy)
-    if distancia < 5: return
+    if distancia < 5: return []
+    # rectángulos de cada punto+punta dibujados (para el modo de rectángulos sucios)
+    rects = []
     pasos = int(distancia // 25)
     for i in range(pasos):
         pos = (i * 25 + offset) % distancia
         t = pos / distancia
         px = x1 + dx * t - cam_x
         py = y1 + dy * t - cam_y
-        pygame.draw.circle(pantalla, color, (int(px), int(py)), grosor)
+        r_punto = pygame.draw.circle(pantalla, color, (int(px), int(py)), grosor)
         angulo = math.atan2(dy, dx)
         punta_x = px + math.cos(angulo) * 8
         punta_y = py + math.sin(angulo) * 8
-        pygame.draw.line(pantalla, color, (px, py), (punta_x, punta_y), 2)
+        r_punta = pygame.draw.line(pantalla, color, (px, py), (punta_x, punta_y), 2)
+        rects.append(r_punto.union(r_punta).inflate(2, 2))
+    return rects
 
 def nodo_mas_cercano(x, y, posiciones):
     min_dist = float("inf")
@@ -331,41 +353,21 @@ def dibujar_minimapa(pantalla, pizzeria, casas, repartidor):
     rx = int(x0 + repartidor.x * escala_x)
     ry = int(y0 + repartidor.y * escala_y)
     pygame.draw.rect(pantalla, ROJO, (rx-2, ry-2, 4, 4))
+    return pygame.Rect(x0-2, y0-2, mini_w+4, mini_h+4)
+
+# --- ENRUTADOR: árbol de caminos de máxima feromona desde la pizzería ---
+# el bucle principal le avisa de cada depósito y de la evaporación; el árbol
+# se actualiza ahí y las consultas (desde el planificador) solo lo recorren
+enrutador = EnrutadorFeromonas(len(nodos), origen=0, umbral=0.05)
 
-# --- NUEVO: función para construir ruta siguiendo feromonas (greedy) ---
-def construir_ruta_de_feromonas(origen_idx, destino_idx, feromonas, posiciones):
+def construir_ruta_de_feromonas(origen_idx, destino_idx, posiciones):
     """
-    Construye una ruta (lista de puntos (x,y)) desde origen_idx hasta destino_idx
-    siguiendo de forma greedy las feromonas. Si no hay feromonas útiles, va directo.
+    Devuelve la ruta (lista de puntos (x,y)) desde la pizzería hasta destino_idx
+    según el árbol del enrutador; no recalcula nada. Si no hay feromonas útiles, va directo.
     """
-    total = len(feromonas)
-    current = origen_idx
-    visited = set([current])
-    ruta = [posiciones[current]]
-    pasos = 0
-    max_pasos = total + 10
-    while current != destino_idx and pasos < max_pasos:
-        pasos += 1
-        candidatos = []
-        for j in range(total):
-            if j in visited:
-                continue
-            candidatos.append((j, feromonas[current][j]))
-        if not candidatos:
-            # sin candidatos, ir directo al destino
-            ruta.append(posiciones[destino_idx])
-            break
-        # elegir vecino con más feromona
-        j_max, val_max = max(candidatos, key=lambda x: x[1])
-        if val_max <= 0.0:
-            ruta.append(posiciones[destino_idx])
-            break
-        ruta.append(posiciones[j_max])
-        visited.add(j_max)
-        current = j_max
-    if ruta[-1] != posiciones[destino_idx]:
-        ruta.append(posiciones[destino_idx])
-    return ruta
+    if origen_idx != enrutador.origen:
+        return [posiciones[origen_idx], posiciones[destino_idx]]
+    return enrutador.ruta(destino_idx, posiciones)
 
 # --- NUEVO: Clase PizzeroAuto (sale de la pizzería y sigue la ruta) ---
 class PizzeroAuto:
@@ -378,6 +380,22 @@ class PizzeroAuto:
         self.vel = velocidad
         self.vivo = True
         self.tiene_pizza = True
+        # ticket de la ruta optimizada pedida al planificador (None si no hay)
+        self.ticket = None
+
+    def cambiar_ruta(self, ruta_puntos):
+        """
+        Sustituye la ruta provisional por la optimizada que llega del planificador.
+        El repartidor sigue desde donde está hacia el siguiente punto de la nueva ruta.
+        """
+        if not self.vivo or len(ruta_puntos) < 2:
+            return
+        self.ruta = [(self.x, self.y)] + [(float(x), float(y)) for (x, y) in ruta_puntos[1:]]
+        self.indice = 1
+        self.ticket = None
+
+    def area(self, cam_x, cam_y):
+        return pygame.Rect(self.x - 18 - cam_x, self.y - 27 - cam_y, 36, 45)
 
     def update(self):
         if not self.vivo:
@@ -418,6 +436,9 @@ class PizzeroAuto:
 # lista global de pizzeros automáticos
 pizzeros_auto = []
 
+# planificador en segundo plano: las rutas se calculan fuera del bucle de 60 FPS
+planificador = PlanificadorRutas(construir_ruta_de_feromonas)
+
 # --- VARIABLES ---
 desplazamiento_flechas = 0
 mensaje = "Recoge una pizza en la pizzería 🍕"
@@ -447,6 +468,15 @@ def rotate_block_by_base_start(block_start):
             new_id = ((c.id + 10 - 1) % 20) + 1
             c.id = new_id
             c.entregada = False
+    # solo cambia la numeración: las posiciones siguen igual, así que las rutas
+    # pendientes del planificador siguen siendo válidas (no se cancelan)
+
+# --- ESTADO DEL MODO RECTÁNGULOS SUCIOS ---
+# fondo_cache guarda el fondo ya dibujado para la cámara cam_cache;
+# rects_previos son las zonas pintadas encima en el frame anterior
+fondo_cache = pygame.Surface((ANCHO, ALTO))
+cam_cache = None
+rects_previos = []
 
 # --- BUCLE PRINCIPAL ---
 ejecutando = True
@@ -463,28 +493,45 @@ while ejecutando:
     cam_x = max(0, min(MAPA_ANCHO - ANCHO, repartidor.x - ANCHO // 2))
     cam_y = max(0, min(MAPA_ALTO - ALTO, repartidor.y - ALTO // 2))
 
-    dibujar_fondo(pantalla, cam_x, cam_y, colisiones)
+    rects_sucios = []
+    redibujo_completo = True
+    if MODO_RECTS_SUCIOS:
+        if (cam_x, cam_y) != cam_cache:
+            # la cámara se movió: fondo nuevo y redibujo completo
+            dibujar_fondo(fondo_cache, cam_x, cam_y, colisiones)
+            cam_cache = (cam_x, cam_y)
+            pantalla.blit(fondo_cache, (0, 0))
+        else:
+            # cámara quieta: solo restaurar el fondo donde se dibujó el frame anterior
+            redibujo_completo = False
+            for r in rects_previos:
+                pantalla.blit(fondo_cache, r, r)
+    else:
+        dibujar_fondo(pantalla, cam_x, cam_y, colisiones)
     posiciones = [(pizzeria.x, pizzeria.y)] + [(c.x, c.y) for c in casas]
 
     nodo_actual = nodo_mas_cercano(repartidor.x, repartidor.y, posiciones)
     if repartidor.nodo_previo is not None and repartidor.nodo_previo != nodo_actual:
         a, b = repartidor.nodo_previo, nodo_actual
-        if (a == 0 or b == 0) and a != b:
+        # se deposita en cada paso entre nodos (también casa-casa), así el rastro
+        # completo pizzería -> ... -> casa queda marcado y el enrutador puede seguirlo
+        if a != b:
             feromonas[a][b] += 1.0
             feromonas[b][a] += 1.0
+            enrutador.depositar(a, b, 1.0)
             direcciones[(a, b)] = (posiciones[a], posiciones[b])
     repartidor.nodo_previo = nodo_actual
 
     for i in range(len(nodos)):
         for j in range(len(nodos)):
             feromonas[i][j] = max(0.0, feromonas[i][j] * 0.995)
+    enrutador.evaporar(0.995)
 
     for (a, b), (p1, p2) in list(direcciones.items()):
-        if a == 0 or b == 0:
-            intensidad = feromonas[a][b]
-            if intensidad > 0.2:
-                grosor = min(6, max(1, int(intensidad)))
-                dibujar_flecha(pantalla, p1[0], p1[1], p2[0], p2[1], AMARILLO, grosor, desplazamiento_flechas, cam_x, cam_y)
+        intensidad = feromonas[a][b]
+        if intensidad > 0.2:
+            grosor = min(6, max(1, int(intensidad)))
+            rects_sucios.extend(dibujar_flecha(pantalla, p1[0], p1[1], p2[0], p2[1], AMARILLO, grosor, desplazamiento_flechas, cam_x, cam_y))
 
     # --- LÓGICA DE ENTREGA ---
     if not repartidor.entregando:
@@ -571,11 +618,12 @@ while ejecutando:
                         ruta_directa = [(pizzeria.x, pizzeria.y), (casa_objetivo.x, casa_objetivo.y)]
                         pizzeros_auto.append(PizzeroAuto(ruta_directa, velocidad=3.5))
                     else:
-                        ruta = construir_ruta_de_feromonas(0, destino_idx, feromonas, posiciones)
-                        # si la ruta es corta o vacía, forzar ruta directa
-                        if not ruta or len(ruta) < 2:
-                            ruta = [(pizzeria.x, pizzeria.y), (casa_objetivo.x, casa_objetivo.y)]
-                        pizzeros_auto.append(PizzeroAuto(ruta, velocidad=3.5))
+                        # sale ya con la ruta directa provisional; la optimizada
+                        # llega del planificador en algún frame posterior
+                        ruta_directa = [(pizzeria.x, pizzeria.y), (casa_objetivo.x, casa_objetivo.y)]
+                        pa = PizzeroAuto(ruta_directa, velocidad=3.5)
+                        pa.ticket = planificador.solicitar(0, destino_idx, posiciones)
+                        pizzeros_auto.append(pa)
                 except Exception:
                     # Siempre evitar romper el loop por errores en creación de automáticos
                     try:
@@ -586,10 +634,20 @@ while ejecutando:
                 # mantenemos la casa_objetivo un breve momento para resaltarla
                 tiempo_restante = 3.0  # mostrar highlight por 3 segundos
 
+    # --- RECOGER RUTAS PLANIFICADAS (no bloquea) ---
+    for ticket, ruta in planificador.recoger():
+        for pa in pizzeros_auto:
+            if pa.ticket == ticket:
+                pa.cambiar_ruta(ruta)
+                break
+
     # --- ACTUALIZAR PIZZEROS AUTOMÁTICOS ---
     for pa in list(pizzeros_auto):
         pa.update()
         if not pa.vivo:
+            # ya llegó: su ruta pendiente (si la hay) ya no hace falta
+            if pa.ticket is not None:
+                planificador.cancelar(pa.ticket)
             try:
                 pizzeros_auto.remove(pa)
             except ValueError:
@@ -600,17 +658,21 @@ while ejecutando:
     pizzeria_parpadeo = (not repartidor.entregando) and pendientes_existentes
     pizzeria_parpadeo = pizzeria_parpadeo and (math.sin(time.time() * 3.0) > 0.0)
     pizzeria.dibujar(pantalla, cam_x, cam_y, parpadeo=pizzeria_parpadeo)
+    rects_sucios.append(pizzeria.area(cam_x, cam_y))
 
     for casa in casas:
         highlight = (casa is casa_objetivo and (repartidor.entregando or tiempo_restante > 0))
         casa.dibujar(pantalla, cam_x, cam_y, highlight=highlight)
+        rects_sucios.append(casa.area(cam_x, cam_y))
 
     # dibujar pizzeros automáticos (si los hay)
     for pa in pizzeros_auto:
         pa.dibujar(pantalla, cam_x, cam_y)
+        rects_sucios.append(pa.area(cam_x, cam_y))
 
     repartidor.dibujar(pantalla, cam_x, cam_y)
-    dibujar_minimapa(pantalla, pizzeria, casas, repartidor)
+    rects_sucios.append(repartidor.area(cam_x, cam_y))
+    rects_sucios.append(dibujar_minimapa(pantalla, pizzeria, casas, repartidor))
 
     # Mensaje + temporizador
     font = pygame.font.SysFont(None, 26)
@@ -620,10 +682,17 @@ while ejecutando:
     texto = font.render(mensaje_mostrar, True, BLANCO)
     fondo_rect = pygame.Surface((texto.get_width()+12, texto.get_height()+6), pygame.SRCALPHA)
     fondo_rect.fill((0,0,0,150))
-    pantalla.blit(fondo_rect, (12, ALTO - 40))
+    rects_sucios.append(pantalla.blit(fondo_rect, (12, ALTO - 40)))
     pantalla.blit(texto, (16, ALTO - 37))
 
-    pygame.display.flip()
+    if redibujo_completo:
+        pygame.display.flip()
+    else:
+        # actualizar lo que se borró (frame anterior) y lo que se dibujó ahora
+        limites = pantalla.get_rect()
+        pygame.display.update([r.clip(limites) for r in rects_previos + rects_sucios])
+    rects_previos = rects_sucios
 
+planificador.detener()
 pygame.quit()
 sys.exit()
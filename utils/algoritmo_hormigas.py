@@ -1,5 +1,6 @@
 import math
 import random
+import time
 
 class Hormiga:
     def __init__(self, nodos, distancias):
@@ -67,19 +68,30 @@ class AlgoritmoHormigas:
         self.beta = beta
         self.feromonas = [[1 for _ in range(len(nodos))] for _ in range(len(nodos))]
 
-    def ejecutar(self):
+    def ejecutar(self, tiempo_limite=None):
+        # tiempo_limite (segundos): se revisa entre hormigas; al agotarse se devuelve
+        # la mejor ruta hasta ahora (siempre se completa al menos una hormiga)
         mejor_ruta = None
         mejor_distancia = float("inf")
+        inicio = time.perf_counter()
 
-        for _ in range(self.iteraciones):
-            hormigas = [Hormiga(self.nodos, self.distancias) for _ in range(self.n_hormigas)]
+        def agotado():
+            if tiempo_limite is None or mejor_ruta is None:
+                return False
+            return time.perf_counter() - inicio >= tiempo_limite
 
-            for hormiga in hormigas:
+        for _ in range(self.iteraciones):
+            hormigas = []
+            for _ in range(self.n_hormigas):
+                if agotado():
+                    return mejor_ruta, mejor_distancia
+                hormiga = Hormiga(self.nodos, self.distancias)
                 ruta = hormiga.construir_recorrido(self.feromonas, self.alpha, self.beta)
                 distancia = hormiga.longitud_total
                 if distancia < mejor_distancia:
                     mejor_ruta = ruta
                     mejor_distancia = distancia
+                hormigas.append(hormiga)
 
             self.actualizar_feromonas(hormigas)
 
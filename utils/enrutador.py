@@ -0,0 +1,111 @@
+import heapq
+import threading
+
+
+class EnrutadorFeromonas:
+    """
+    Mantiene el árbol de caminos "más anchos" (máxima feromona mínima en el camino)
+    desde el nodo origen (la pizzería) hasta cada casa, como punteros a padre.
+    Quien deposita feromona avisa con depositar() y la evaporación con evaporar();
+    el árbol se actualiza solo en la parte afectada y consultar una ruta cuesta
+    lo que mide el camino.
+    """
+
+    def __init__(self, n_nodos, origen=0, umbral=0.05):
+        self.origen = origen
+        # crecimiento relativo mínimo de una arista para actualizar el árbol con ella
+        self.umbral = umbral
+        # pesos internos = feromona / escala; la evaporación uniforme solo toca escala,
+        # así que no cambia qué camino es mejor ni obliga a recalcular nada
+        self.escala = 1.0
+        self.pesos = [[0.0] * n_nodos for _ in range(n_nodos)]
+        # peso de cada arista la última vez que el árbol la tuvo en cuenta (deriva por arista)
+        self.vistos = [[0.0] * n_nodos for _ in range(n_nodos)]
+        self.ancho = [0.0] * n_nodos
+        self.saltos = [float("inf")] * n_nodos
+        self.padres = [None] * n_nodos
+        self.ancho[origen] = float("inf")
+        self.saltos[origen] = 0
+        self.actualizaciones = 0
+        # el árbol se actualiza en el bucle principal y se consulta desde el planificador
+        self._lock = threading.Lock()
+
+    def evaporar(self, factor):
+        """Evaporación uniforme de todas las aristas, O(1)."""
+        self.escala *= factor
+        if self.escala < 1e-50:
+            self._reescalar()
+
+    def depositar(self, a, b, cantidad):
+        """
+        Suma `cantidad` de feromona a la arista a-b (simétrica).
+        Solo si la arista creció más que `umbral` desde la última vez que se
+        usó (o acaba de aparecer) se propaga la mejora por el árbol.
+        Devuelve True si el árbol se actualizó.
+        """
+        with self._lock:
+            extra = cantidad / self.escala
+            self.pesos[a][b] += extra
+            self.pesos[b][a] += extra
+            visto = self.vistos[a][b]
+            if visto > 0.0 and self.pesos[a][b] - visto <= self.umbral * visto:
+                return False
+            self.vistos[a][b] = self.vistos[b][a] = self.pesos[a][b]
+            self._propagar(a, b)
+            self.actualizaciones += 1
+            return True
+
+    def ruta(self, destino_idx, posiciones):
+        """
+        Lista de puntos (x,y) desde el origen hasta destino_idx siguiendo los padres.
+        Si el destino no es alcanzable por feromonas, ruta directa.
+        """
+        with self._lock:
+            nodos = []
+            actual = destino_idx
+            while actual is not None and len(nodos) <= len(self.padres):
+                nodos.append(actual)
+                actual = self.padres[actual]
+        if nodos[-1] != self.origen:
+            return [posiciones[self.origen], posiciones[destino_idx]]
+        return [posiciones[i] for i in reversed(nodos)]
+
+    def _propagar(self, a, b):
+        # Los pesos internos solo crecen, así que basta propagar mejoras desde la
+        # arista que cambió (Dijkstra de "camino más ancho" limitado a lo afectado).
+        # En empate de anchura se prefiere el camino con menos saltos.
+        cola = []
+        self._relajar(a, b, cola)
+        self._relajar(b, a, cola)
+        while cola:
+            menos_ancho, saltos, u = heapq.heappop(cola)
+            if -menos_ancho != self.ancho[u] or saltos != self.saltos[u]:
+                continue  # entrada vieja
+            for v in range(len(self.pesos)):
+                self._relajar(u, v, cola)
+
+    def _relajar(self, u, v, cola):
+        if v == self.origen or u == v or self.ancho[u] <= 0.0:
+            return
+        peso = self.pesos[u][v]
+        if peso <= 0.0:
+            return
+        w = min(self.ancho[u], peso)
+        s = self.saltos[u] + 1
+        if w > self.ancho[v] or (w == self.ancho[v] and s < self.saltos[v]):
+            self.ancho[v] = w
+            self.saltos[v] = s
+            self.padres[v] = u
+            heapq.heappush(cola, (-w, s, v))
+
+    def _reescalar(self):
+        # evita el desbordamiento por abajo de escala; raro y fuera de las consultas
+        with self._lock:
+            f = self.escala
+            for fila in self.pesos + self.vistos:
+                for j in range(len(fila)):
+                    fila[j] *= f
+            for i, w in enumerate(self.ancho):
+                if i != self.origen:
+                    self.ancho[i] = w * f
+            self.escala = 1.0
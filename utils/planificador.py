@@ -0,0 +1,88 @@
+import queue
+import threading
+
+
+class PlanificadorRutas:
+    """
+    Servicio de planificación de rutas en segundo plano.
+    El bucle principal envía solicitudes con solicitar() y en cada frame
+    recoge las rutas terminadas con recoger(), sin bloquear nunca.
+    El cálculo lo hace un hilo trabajador llamando a `resolver`.
+    """
+
+    def __init__(self, resolver):
+        # resolver(origen_idx, destino_idx, posiciones) -> lista de (x,y)
+        self.resolver = resolver
+        self.solicitudes = queue.Queue()
+        self.resultados = queue.Queue()
+        # tickets aún esperados; cancelar() los quita y el hilo se salta los demás
+        self._vivos = set()
+        self._siguiente_ticket = 0
+        self._lock = threading.Lock()
+        self.hilo = threading.Thread(target=self._trabajar, daemon=True)
+        self.hilo.start()
+
+    def solicitar(self, origen_idx, destino_idx, posiciones):
+        """
+        Encola una solicitud de ruta y devuelve su ticket.
+        Se copian las posiciones para que el hilo no vea cambios a medias.
+        """
+        with self._lock:
+            self._siguiente_ticket += 1
+            ticket = self._siguiente_ticket
+            self._vivos.add(ticket)
+        self.solicitudes.put((ticket, origen_idx, destino_idx, list(posiciones)))
+        return ticket
+
+    def cancelar(self, ticket):
+        """
+        Descarta la solicitud `ticket`: si aún no se calculó, el hilo se la salta,
+        y si ya está calculada no la devolverá recoger().
+        """
+        with self._lock:
+            self._vivos.discard(ticket)
+
+    def recoger(self):
+        """
+        Devuelve (sin bloquear) la lista de (ticket, ruta) terminados y no cancelados.
+        """
+        listos = []
+        while True:
+            try:
+                ticket, ruta = self.resultados.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                if ticket not in self._vivos:
+                    continue
+                self._vivos.discard(ticket)
+            listos.append((ticket, ruta))
+        return listos
+
+    def detener(self, espera=1.0):
+        self.solicitudes.put(None)
+        self.hilo.join(espera)
+
+    def _vivo(self, ticket):
+        with self._lock:
+            return ticket in self._vivos
+
+    def _trabajar(self):
+        while True:
+            solicitud = self.solicitudes.get()
+            if solicitud is None:
+                break
+            ticket, origen_idx, destino_idx, posiciones = solicitud
+            if not self._vivo(ticket):
+                continue
+            try:
+                ruta = self.resolver(origen_idx, destino_idx, posiciones)
+            except Exception as e:
+                # nunca tumbar el hilo: el repartidor se queda con su ruta provisional
+                print("Error planificando ruta:", e)
+                self.cancelar(ticket)
+                continue
+            if ruta and len(ruta) >= 2 and self._vivo(ticket):
+                self.resultados.put((ticket, ruta))
+            else:
+                self.cancelar(ticket)